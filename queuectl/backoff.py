@@ -1,6 +1,18 @@
 # queuectl/backoff.py
 
+from typing import Dict, List
+
+# Attempts are bounded by max_retries and bases are tiny config values,
+# so memoizing the powers removes the arithmetic from the failure path.
+_TABLE: Dict[int, List[int]] = {}
+
+
 def compute_backoff(base: int, attempts: int) -> int:
     if attempts <= 0:
         return 0
-    return base ** attempts
+    table = _TABLE.get(base)
+    if table is None:
+        table = _TABLE.setdefault(base, [1])
+    while len(table) <= attempts:
+        table.append(table[-1] * base)
+    return table[attempts]
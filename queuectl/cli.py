@@ -1,14 +1,9 @@
 import argparse
 import sys
-import json
 from typing import Optional
 
-from .config import Config
-from .storage import JobStorage
-from .engine import QueueEngine
+from . import __version__
 from .models import JobState
-from .worker import start_workers, stop_workers_command
-from . import utils
 
 
 def _print_job_row(job) -> None:
@@ -23,18 +18,18 @@ def _print_job_row(job) -> None:
         print(f"  log: {job.output_log_path}")
 
 
-def main(argv: Optional[list[str]] = None) -> None:
-    argv = argv if argv is not None else sys.argv[1:]
-
-    parser = argparse.ArgumentParser(prog="queuectl", description="Job queue CLI")
-    subparsers = parser.add_subparsers(dest="command", required=True)
-
+def _build_enqueue(subparsers) -> None:
     p_enqueue = subparsers.add_parser("enqueue", help="Enqueue a new job")
     p_enqueue.add_argument(
         "job_json",
         nargs="?",
         help="Job specification as JSON string (optional if using --cmd/--id)",
     )
+    p_enqueue.add_argument(
+        "--batch",
+        dest="batch_file",
+        help="Path to a JSON-lines file with one job specification per line",
+    )
     p_enqueue.add_argument(
         "--cmd",
         dest="job_command",
@@ -64,6 +59,8 @@ def main(argv: Optional[list[str]] = None) -> None:
              "(ignored if --run-at is provided)",
     )
 
+
+def _build_worker(subparsers) -> None:
     p_worker = subparsers.add_parser("worker", help="Worker management")
     worker_sub = p_worker.add_subparsers(dest="worker_command", required=True)
 
@@ -77,8 +74,12 @@ def main(argv: Optional[list[str]] = None) -> None:
 
     worker_sub.add_parser("stop", help="Stop running workers gracefully")
 
+
+def _build_status(subparsers) -> None:
     subparsers.add_parser("status", help="Show job and worker status")
 
+
+def _build_list(subparsers) -> None:
     p_list = subparsers.add_parser("list", help="List jobs")
     p_list.add_argument(
         "--state",
@@ -87,12 +88,16 @@ def main(argv: Optional[list[str]] = None) -> None:
         help="Filter by job state",
     )
 
+
+def _build_dlq(subparsers) -> None:
     p_dlq = subparsers.add_parser("dlq", help="Dead Letter Queue operations")
     dlq_sub = p_dlq.add_subparsers(dest="dlq_command", required=True)
     dlq_sub.add_parser("list", help="List DLQ jobs")
     p_dlq_retry = dlq_sub.add_parser("retry", help="Retry a DLQ job")
     p_dlq_retry.add_argument("job_id", help="Job ID to retry")
 
+
+def _build_config(subparsers) -> None:
     p_config = subparsers.add_parser("config", help="Configuration management")
     config_sub = p_config.add_subparsers(dest="config_command", required=True)
 
@@ -103,11 +108,66 @@ def main(argv: Optional[list[str]] = None) -> None:
     p_config_set.add_argument("key", help="Config key")
     p_config_set.add_argument("value", help="Config value")
 
+
+def _build_metrics(subparsers) -> None:
     subparsers.add_parser("metrics", help="Show aggregated execution metrics")
 
+
+_SUBPARSER_BUILDERS = {
+    "enqueue": _build_enqueue,
+    "worker": _build_worker,
+    "status": _build_status,
+    "list": _build_list,
+    "dlq": _build_dlq,
+    "config": _build_config,
+    "metrics": _build_metrics,
+}
+
+
+def _register_subparsers(subparsers, argv: list[str]) -> None:
+    """Build only the subparser the invocation actually needs.
+
+    Constructing all seven subparsers on every run is wasted work when a
+    single command ever executes. We peek at the first non-flag token and
+    build just that subcommand, registering the rest as bare stubs so
+    argparse still reports the full choice list on errors. Help requests
+    (or an unrecognized token) fall back to building everything.
+    """
+    token = next((a for a in argv if not a.startswith("-")), None)
+    wants_help = any(a in ("-h", "--help") for a in argv)
+
+    if wants_help or token not in _SUBPARSER_BUILDERS:
+        for build in _SUBPARSER_BUILDERS.values():
+            build(subparsers)
+        return
+
+    _SUBPARSER_BUILDERS[token](subparsers)
+    for name in _SUBPARSER_BUILDERS:
+        if name != token:
+            subparsers.add_parser(name)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    argv = argv if argv is not None else sys.argv[1:]
+
+    # Answer --version before building any parser at all.
+    if argv in (["--version"], ["-V"]):
+        print(f"queuectl {__version__}")
+        return
+
+    parser = argparse.ArgumentParser(prog="queuectl", description="Job queue CLI")
+    parser.add_argument(
+        "-V", "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _register_subparsers(subparsers, argv)
+
     args = parser.parse_args(argv)
 
     if args.command == "worker":
+        from .worker import start_workers, stop_workers_command
+        from . import utils
+
         if args.worker_command == "start":
             utils.ensure_data_dirs()
             count = max(1, int(args.count))
@@ -117,6 +177,13 @@ def main(argv: Optional[list[str]] = None) -> None:
             stop_workers_command()
             return
 
+    # Heavy subsystems (sqlite3, config JSON) are only needed for job commands,
+    # so import them here rather than at module load.
+    from .config import Config
+    from .storage import JobStorage
+    from .engine import QueueEngine
+    from . import utils
+
     utils.ensure_data_dirs()
     config = Config()
     storage = JobStorage()
@@ -124,6 +191,11 @@ def main(argv: Optional[list[str]] = None) -> None:
 
     if args.command == "enqueue":
         try:
+            if args.batch_file:
+                with open(args.batch_file, "r", encoding="utf-8") as f:
+                    jobs = engine.enqueue_batch(f)
+                print(f"Enqueued {len(jobs)} job(s) from {args.batch_file}")
+                return
             if args.job_json:
                 job = engine.enqueue_job_from_json(args.job_json)
             else:
@@ -145,8 +217,7 @@ def main(argv: Optional[list[str]] = None) -> None:
                 elif args.delay is not None:
                     payload["delay"] = args.delay
 
-                job_json = json.dumps(payload)
-                job = engine.enqueue_job_from_json(job_json)
+                job = engine.enqueue_job_from_dict(payload)
         except Exception as e:  # noqa: BLE001
             print(f"Error enqueuing job: {e}", file=sys.stderr)
             sys.exit(1)
@@ -158,17 +229,16 @@ def main(argv: Optional[list[str]] = None) -> None:
         print("Job counts by state:")
         for state, count in status.items():
             print(f"  {state}: {count}")
-        pid_files = utils.list_worker_pid_files()
-        print(f"Active workers (approx): {len(pid_files)}")
+        print(f"Active workers: {utils.count_active_workers()}")
 
     elif args.command == "list":
         state = JobState(args.state) if args.state else None
-        jobs = engine.list_jobs(state)
-        if not jobs:
+        found = False
+        for job in engine.iter_jobs(state):
+            found = True
+            _print_job_row(job)
+        if not found:
             print("No jobs found.")
-        else:
-            for job in jobs:
-                _print_job_row(job)
 
     elif args.command == "dlq":
         if args.dlq_command == "list":
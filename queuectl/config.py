@@ -1,40 +1,68 @@
 
 import json
+import os
 from typing import Any, Dict
 from . import utils
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Config:
-    
+
 
     DEFAULTS: Dict[str, Any] = {
         "max_retries": 3,
         "backoff_base": 2,
-        "job_timeout": 60, 
+        "job_timeout": 60,
     }
 
+    ENV_PREFIX = "QUEUECTL_"
+
     def __init__(self) -> None:
-        utils.ensure_data_dirs()
-        self._path = utils.get_data_file("config.json")
+        self._path: str = ""
         self._data: Dict[str, Any] = dict(self.DEFAULTS)
-        self._load()
+        self._loaded = False
 
-    def _load(self) -> None:
+    def _ensure_loaded(self) -> None:
+        # Reading config.json is deferred until a value is actually asked
+        # for, so commands that never consult config skip the file I/O.
+        if self._loaded:
+            return
+        self._loaded = True
+        utils.ensure_data_dirs()
+        self._path = utils.get_data_file("config.json")
         try:
-            with open(self._path, "r", encoding="utf-8") as f:
-                stored = json.load(f)
+            with open(self._path, "rb") as f:
+                raw = f.read()
+            stored = orjson.loads(raw) if orjson is not None else json.loads(raw)
             self._data.update(stored)
         except FileNotFoundError:
             self._save()
 
     def _save(self) -> None:
-        with open(self._path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(self._data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(self._data, indent=2).encode("utf-8")
+        with open(self._path, "wb") as f:
+            f.write(payload)
 
     def get(self, key: str, default: Any = None) -> Any:
+        # Environment overrides (e.g. QUEUECTL_MAX_RETRIES) win over the
+        # file and avoid loading it at all.
+        env_value = os.environ.get(self.ENV_PREFIX + key.upper())
+        if env_value is not None:
+            return int(env_value) if env_value.isdigit() else env_value
+        self._ensure_loaded()
         return self._data.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
+        self._ensure_loaded()
+        if key in self._data and self._data[key] == value:
+            return
         self._data[key] = value
         self._save()
 
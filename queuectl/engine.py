@@ -2,7 +2,17 @@
 
 import json
 from datetime import timedelta, datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson parses severalfold faster than the stdlib; fall back silently
+# when it is not installed. The fallback binds one decoder's decode
+# method so each parse skips json.loads' per-call argument checks.
+_loads = orjson.loads if orjson is not None else json.JSONDecoder().decode
 
 from .models import Job, JobState
 from .storage import JobStorage
@@ -19,12 +29,40 @@ class QueueEngine:
         self.config = config
 
     def enqueue_job_from_json(self, job_json: str) -> Job:
-        
+
         try:
-            data = json.loads(job_json)
+            data = _loads(job_json)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid job JSON: {e}") from e
 
+        return self.enqueue_job_from_dict(data)
+
+    def enqueue_job_from_dict(self, data: Dict[str, Any]) -> Job:
+
+        job = self._build_job(data)
+        self.storage.enqueue(job)
+        utils.notify_workers()
+        return job
+
+    def enqueue_batch(self, job_jsons: Iterable[str]) -> List[Job]:
+
+        jobs = []
+        for line_no, raw in enumerate(job_jsons, start=1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                data = _loads(raw)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid job JSON on line {line_no}: {e}") from e
+            jobs.append(self._build_job(data))
+
+        self.storage.enqueue_many(jobs)
+        if jobs:
+            utils.notify_workers()
+        return jobs
+
+    def _build_job(self, data: Dict[str, Any]) -> Job:
         if "command" not in data or not data["command"]:
             raise ValueError("Job JSON must contain a non-empty 'command' field")
 
@@ -71,14 +109,23 @@ class QueueEngine:
             last_error=None,
             output_log_path=None,
         )
-
-        self.storage.enqueue(job)
         return job
 
     def acquire_job_for_worker(self) -> Optional[Job]:
         now_iso = utils.utc_now_iso()
         return self.storage.acquire_due_job(now_iso)
 
+    def acquire_jobs_for_worker(self, batch: int = 32) -> List[Job]:
+        now_iso = utils.utc_now_iso()
+        return self.storage.acquire_due_jobs(now_iso, batch)
+
+    def release_job(self, job: Job) -> None:
+        # Return a claimed-but-unstarted job to the queue, e.g. when a
+        # worker shuts down partway through a batch.
+        job.state = JobState.PENDING
+        job.updated_at = utils.utc_now_iso()
+        self.storage.update_job(job)
+
     def complete_job(self, job: Job, output_log_path: Optional[str]) -> None:
         job.state = JobState.COMPLETED
         job.updated_at = utils.utc_now_iso()
@@ -87,10 +134,17 @@ class QueueEngine:
         job.output_log_path = output_log_path
         self.storage.update_job(job)
 
-    def fail_job(self, job: Job, error_message: str) -> None:
+    def fail_job(
+        self, job: Job, error_message: str, output_log_path: Optional[str] = None
+    ) -> None:
+        # Grab the clock once and derive both the update stamp and the
+        # retry time from it.
+        now = utils.utc_now()
         job.attempts += 1
-        job.updated_at = utils.utc_now_iso()
+        job.updated_at = now.isoformat(timespec="seconds")
         job.last_error = error_message
+        if output_log_path is not None:
+            job.output_log_path = output_log_path
 
         if job.attempts >= job.max_retries:
             job.state = JobState.DEAD
@@ -99,11 +153,14 @@ class QueueEngine:
             job.state = JobState.FAILED
             base = self.config.backoff_base
             delay_seconds = compute_backoff(base, job.attempts)
-            next_time = utils.utc_now() + timedelta(seconds=delay_seconds)
+            next_time = now + timedelta(seconds=delay_seconds)
             job.next_run_at = next_time.isoformat(timespec="seconds")
 
         self.storage.update_job(job)
 
+    def iter_jobs(self, state: Optional[JobState] = None) -> Iterator[Job]:
+        return self.storage.iter_jobs(state)
+
     def list_jobs(self, state: Optional[JobState] = None) -> List[Job]:
         return self.storage.list_jobs(state)
 
@@ -127,52 +184,33 @@ class QueueEngine:
         job.next_run_at = job.updated_at
         job.last_error = None
         self.storage.update_job(job)
+        utils.notify_workers()
         return job
 
     def metrics(self) -> Dict[str, Any]:
-        
-        jobs = self.storage.list_jobs()
-        total = len(jobs)
-
-        by_state = {
-            JobState.PENDING: [],
-            JobState.PROCESSING: [],
-            JobState.COMPLETED: [],
-            JobState.FAILED: [],
-            JobState.DEAD: [],
-        }
-        for j in jobs:
-            by_state[j.state].append(j)
 
-        completed = by_state[JobState.COMPLETED]
-        dead = by_state[JobState.DEAD]
+        agg = self.storage.metrics_aggregate()
+        counts = agg["counts"]
+        attempts_sum = agg["attempts_sum"]
 
-        def avg_attempts(js):
-            return (sum(j.attempts for j in js) / len(js)) if js else 0.0
+        total = sum(counts.values())
+        n_completed = counts[JobState.COMPLETED]
+        n_dead = counts[JobState.DEAD]
 
-        avg_attempts_completed = avg_attempts(completed)
-        avg_attempts_dead = avg_attempts(dead)
-
-        durations = []
-        for j in completed:
-            try:
-                created = datetime.fromisoformat(j.created_at)
-                updated = datetime.fromisoformat(j.updated_at)
-                durations.append((updated - created).total_seconds())
-            except Exception:
-                continue
-
-        avg_duration_completed = (
-            sum(durations) / len(durations) if durations else 0.0
+        avg_attempts_completed = (
+            attempts_sum[JobState.COMPLETED] / n_completed if n_completed else 0.0
+        )
+        avg_attempts_dead = (
+            attempts_sum[JobState.DEAD] / n_dead if n_dead else 0.0
         )
 
-        success_rate = (len(completed) / total) if total else 0.0
+        success_rate = (n_completed / total) if total else 0.0
 
         return {
             "total_jobs": total,
-            "by_state": {s.value: len(by_state[s]) for s in by_state},
+            "by_state": {s.value: counts[s] for s in JobState},
             "success_rate": success_rate,
             "avg_attempts_completed": avg_attempts_completed,
             "avg_attempts_dead": avg_attempts_dead,
-            "avg_duration_completed_seconds": avg_duration_completed,
+            "avg_duration_completed_seconds": float(agg["avg_duration_completed"]),
         }
@@ -1,4 +1,6 @@
 
+import os
+import signal
 import subprocess
 from typing import NamedTuple, Optional
 from pathlib import Path
@@ -14,41 +16,47 @@ class ExecutionResult(NamedTuple):
 
 
 def run_job(job: Job, timeout: int) -> ExecutionResult:
-    
+
     logs_dir = Path(utils.get_logs_dir())
     log_path = logs_dir / f"job-{job.id}.log"
 
-    try:
-        completed = subprocess.run(
+    # Redirect the command's output straight into the log file so memory
+    # stays constant no matter how much the job prints; the process runs
+    # in its own session so a timeout can kill the whole group.
+    timeout_msg = None
+    with open(log_path, "wb") as log_file:
+        proc = subprocess.Popen(
             job.command,
             shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        output = ""
-        if completed.stdout:
-            output += completed.stdout
-        if completed.stderr:
-            if output:
-                output += "\n"
-            output += completed.stderr
-
-        log_path.write_text(output, encoding="utf-8")
-
-        exit_code = completed.returncode
-        error_message = None if exit_code == 0 else (completed.stderr or "Non-zero exit code")
-
-        return ExecutionResult(
-            exit_code=exit_code,
-            output_log_path=str(log_path),
-            error_message=error_message,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
         )
-    except subprocess.TimeoutExpired as e:
-        msg = f"Command timed out after {timeout} seconds"
-        log_path.write_text(msg, encoding="utf-8")
+        try:
+            exit_code = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                proc.kill()
+            proc.wait()
+            timeout_msg = f"Command timed out after {timeout} seconds"
+            log_file.write(f"\n{timeout_msg}\n".encode("utf-8"))
+
+    # The log is append-only history from here on; drop its pages so
+    # long-running workers don't crowd the database out of the cache.
+    utils.drop_from_cache(str(log_path))
+
+    if timeout_msg is not None:
         return ExecutionResult(
             exit_code=-1,
             output_log_path=str(log_path),
-            error_message=msg,
+            error_message=timeout_msg,
         )
+
+    error_message = None if exit_code == 0 else f"Command exited with code {exit_code}"
+    return ExecutionResult(
+        exit_code=exit_code,
+        output_log_path=str(log_path),
+        error_message=error_message,
+    )
@@ -13,7 +13,7 @@ class JobState(str, Enum):
     DEAD = "dead"
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     id: str
     command: str
@@ -1,59 +1,222 @@
 
 
+import os
 import sqlite3
-from typing import List, Optional, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 
 from .models import Job, JobState
 from . import utils
 
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Enum construction does linear lookup work in __new__; a dict lookup on
+# the value string is much cheaper per row.
+_STATE_CACHE = {s.value: s for s in JobState}
+
+
+# SQL text is hoisted to module constants so sqlite3's per-connection
+# prepared-statement cache always sees the same string objects and never
+# re-parses these on the hot paths.
+_SQL_INSERT = """
+    INSERT INTO jobs (
+        id, command, state, attempts, max_retries,
+        created_at, updated_at, next_run_at, last_error, output_log_path,
+        created_at_ts, updated_at_ts
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+              strftime('%s', ?), strftime('%s', ?))
+"""
+
+_SQL_UPDATE = """
+    UPDATE jobs
+    SET command = ?, state = ?, attempts = ?, max_retries = ?,
+        created_at = ?, updated_at = ?, next_run_at = ?,
+        last_error = ?, output_log_path = ?,
+        created_at_ts = strftime('%s', ?),
+        updated_at_ts = strftime('%s', ?)
+    WHERE id = ?
+"""
+
+_SQL_GET = "SELECT * FROM jobs WHERE id = ?;"
+
+_SQL_LIST_ALL = "SELECT * FROM jobs ORDER BY created_at;"
+
+
+def _list_sql(state: JobState) -> str:
+    # One literal-state statement per JobState so the partial indexes
+    # match and the cached text stays stable. The redundant IN clause on
+    # the queue states lets SQLite prove the query implies idx_jobs_due's
+    # WHERE, so those listings scan the partial index, not the table.
+    if state in (JobState.PENDING, JobState.FAILED):
+        return (
+            "SELECT * FROM jobs WHERE state IN ('pending', 'failed') "
+            f"AND state = '{state.value}' ORDER BY created_at;"
+        )
+    return f"SELECT * FROM jobs WHERE state = '{state.value}' ORDER BY created_at;"
+
+
+_SQL_LIST_BY_STATE = {s: _list_sql(s) for s in JobState}
+
+_SQL_ACQUIRE_CLAIM = """
+    UPDATE jobs
+    SET state = ?, updated_at = ?, updated_at_ts = strftime('%s', ?)
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE state IN ('pending', 'failed')
+          AND (next_run_at IS NULL OR next_run_at <= ?)
+        ORDER BY created_at
+        LIMIT ?
+    )
+    RETURNING *
+"""
+
+_SQL_ACQUIRE_SELECT = """
+    SELECT * FROM jobs
+    WHERE state IN ('pending', 'failed')
+      AND (next_run_at IS NULL OR next_run_at <= ?)
+    ORDER BY created_at
+    LIMIT ?
+"""
+
+_SQL_ACQUIRE_UPDATE = """
+    UPDATE jobs
+    SET state = ?, updated_at = ?, updated_at_ts = strftime('%s', ?)
+    WHERE id = ?
+"""
+
+
+def _job_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Job:
+    # Build the Job straight from the raw tuple, skipping the sqlite3.Row
+    # wrapper and its per-column name lookups. Column order matches the
+    # jobs table schema; the trailing *_ts columns are internal only.
+    return Job(
+        row[0],
+        row[1],
+        _STATE_CACHE[row[2]],
+        row[3],
+        row[4],
+        row[5],
+        row[6],
+        row[7],
+        row[8],
+        row[9],
+    )
+
 
 class JobStorage:
-    
+
 
     def __init__(self, db_path: Optional[str] = None) -> None:
         utils.ensure_data_dirs()
         self.db_path = db_path or utils.get_data_file("jobs.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
         self._init_db()
 
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
-        conn.row_factory = sqlite3.Row
-        return conn
+        # Reuse one connection per process instead of paying connect/close
+        # on every call. SQLite handles are not fork-safe, so a child that
+        # inherits this storage transparently reopens its own connection.
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conn.execute("PRAGMA temp_store=MEMORY;")
+            # Memory-map the database so all worker processes share the
+            # same page-cache pages through the OS instead of each
+            # holding a private copy; WAL already lets their reads run
+            # concurrently with writes.
+            conn.execute("PRAGMA mmap_size=268435456;")
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None and self._conn_pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._conn_pid = None
 
     def _init_db(self) -> None:
         conn = self._get_connection()
-        try:
-            conn.execute("PRAGMA journal_mode=WAL;")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id TEXT PRIMARY KEY,
-                    command TEXT NOT NULL,
-                    state TEXT NOT NULL,
-                    attempts INTEGER NOT NULL DEFAULT 0,
-                    max_retries INTEGER NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    next_run_at TEXT,
-                    last_error TEXT,
-                    output_log_path TEXT
-                );
-                """
-            )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                command TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_retries INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                next_run_at TEXT,
+                last_error TEXT,
+                output_log_path TEXT,
+                created_at_ts INTEGER,
+                updated_at_ts INTEGER
+            );
+            """
+        )
+        self._migrate_epoch_columns(conn)
+        # Partial indexes only cover the states each hot query cares
+        # about, so they stay tiny and cache-resident: idx_jobs_due backs
+        # the acquire_due_jobs claim, idx_jobs_dead backs DLQ listings.
+        # The matching queries inline the state literals because SQLite
+        # only uses a partial index when the query text implies its
+        # WHERE. idx_jobs_due is keyed created_at-first so the claim's
+        # ORDER BY created_at LIMIT N walks the index in claim order and
+        # stops at N, with next_run_at filtered from the second key.
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type = 'index' AND name = 'idx_jobs_due';"
+        ).fetchone()
+        if row and "(created_at, next_run_at)" not in row[0]:
+            # Databases from before the re-keying carry the old
+            # (next_run_at, created_at) shape, which the claim query
+            # cannot use for its ordering.
+            conn.execute("DROP INDEX idx_jobs_due;")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_due "
+            "ON jobs (created_at, next_run_at) "
+            "WHERE state IN ('pending', 'failed');"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_dead "
+            "ON jobs (created_at) WHERE state = 'dead';"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_jobs_state_next_run;")
+        conn.execute("DROP INDEX IF EXISTS idx_jobs_acquire;")
+
+    @staticmethod
+    def _migrate_epoch_columns(conn: sqlite3.Connection) -> None:
+        # Databases created before the epoch columns existed get them added
+        # and backfilled from the ISO strings. The backfill only runs when
+        # the columns were just added: every write path populates them, so
+        # re-scanning the table on each open would be pure overhead.
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(jobs);")}
+        if "created_at_ts" not in cols:
+            conn.execute("ALTER TABLE jobs ADD COLUMN created_at_ts INTEGER;")
+            conn.execute("ALTER TABLE jobs ADD COLUMN updated_at_ts INTEGER;")
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_jobs_state_next_run "
-                "ON jobs (state, next_run_at);"
+                "UPDATE jobs SET created_at_ts = strftime('%s', created_at), "
+                "updated_at_ts = strftime('%s', updated_at) "
+                "WHERE created_at_ts IS NULL;"
             )
-        finally:
-            conn.close()
 
     @staticmethod
     def _row_to_job(row: sqlite3.Row) -> Job:
         return Job(
             id=row["id"],
             command=row["command"],
-            state=JobState(row["state"]),
+            state=_STATE_CACHE[row["state"]],
             attempts=row["attempts"],
             max_retries=row["max_retries"],
             created_at=row["created_at"],
@@ -65,127 +228,184 @@ class JobStorage:
 
     def enqueue(self, job: Job) -> None:
         conn = self._get_connection()
-        try:
-            conn.execute(
-                """
-                INSERT INTO jobs (
-                    id, command, state, attempts, max_retries,
-                    created_at, updated_at, next_run_at, last_error, output_log_path
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    job.id,
-                    job.command,
-                    job.state.value,
-                    job.attempts,
-                    job.max_retries,
-                    job.created_at,
-                    job.updated_at,
-                    job.next_run_at,
-                    job.last_error,
-                    job.output_log_path,
-                ),
+        conn.execute(
+            _SQL_INSERT,
+            (
+                job.id,
+                job.command,
+                job.state.value,
+                job.attempts,
+                job.max_retries,
+                job.created_at,
+                job.updated_at,
+                job.next_run_at,
+                job.last_error,
+                job.output_log_path,
+                job.created_at,
+                job.updated_at,
+            ),
+        )
+
+    def enqueue_many(self, jobs: Iterable[Job]) -> int:
+        # One transaction (and one fsync) for the whole batch instead of
+        # paying commit overhead per row.
+        conn = self._get_connection()
+        rows = [
+            (
+                job.id,
+                job.command,
+                job.state.value,
+                job.attempts,
+                job.max_retries,
+                job.created_at,
+                job.updated_at,
+                job.next_run_at,
+                job.last_error,
+                job.output_log_path,
+                job.created_at,
+                job.updated_at,
             )
-        finally:
-            conn.close()
+            for job in jobs
+        ]
+        if not rows:
+            return 0
+        conn.execute("BEGIN;")
+        try:
+            conn.executemany(_SQL_INSERT, rows)
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+        return len(rows)
 
     def get_job(self, job_id: str) -> Optional[Job]:
         conn = self._get_connection()
-        try:
-            cur = conn.execute("SELECT * FROM jobs WHERE id = ?;", (job_id,))
-            row = cur.fetchone()
-            return self._row_to_job(row) if row else None
-        finally:
-            conn.close()
+        cur = conn.execute(_SQL_GET, (job_id,))
+        cur.row_factory = _job_row_factory
+        return cur.fetchone()
 
     def update_job(self, job: Job) -> None:
         conn = self._get_connection()
-        try:
-            conn.execute(
-                """
-                UPDATE jobs
-                SET command = ?, state = ?, attempts = ?, max_retries = ?,
-                    created_at = ?, updated_at = ?, next_run_at = ?,
-                    last_error = ?, output_log_path = ?
-                WHERE id = ?
-                """,
-                (
-                    job.command,
-                    job.state.value,
-                    job.attempts,
-                    job.max_retries,
-                    job.created_at,
-                    job.updated_at,
-                    job.next_run_at,
-                    job.last_error,
-                    job.output_log_path,
-                    job.id,
-                ),
-            )
-        finally:
-            conn.close()
+        conn.execute(
+            _SQL_UPDATE,
+            (
+                job.command,
+                job.state.value,
+                job.attempts,
+                job.max_retries,
+                job.created_at,
+                job.updated_at,
+                job.next_run_at,
+                job.last_error,
+                job.output_log_path,
+                job.created_at,
+                job.updated_at,
+                job.id,
+            ),
+        )
 
-    def list_jobs(self, state: Optional[JobState] = None) -> List[Job]:
+    def iter_jobs(self, state: Optional[JobState] = None) -> Iterator[Job]:
+        # Stream rows one at a time so scans over large queues stay O(1)
+        # in memory; use list_jobs when a materialized list is needed.
         conn = self._get_connection()
-        try:
-            if state is None:
-                cur = conn.execute("SELECT * FROM jobs ORDER BY created_at;")
-            else:
-                cur = conn.execute(
-                    "SELECT * FROM jobs WHERE state = ? ORDER BY created_at;",
-                    (state.value,),
-                )
-            return [self._row_to_job(row) for row in cur.fetchall()]
-        finally:
-            conn.close()
+        if state is None:
+            cur = conn.execute(_SQL_LIST_ALL)
+        else:
+            cur = conn.execute(_SQL_LIST_BY_STATE[state])
+        cur.row_factory = _job_row_factory
+        yield from cur
+
+    def list_jobs(self, state: Optional[JobState] = None) -> List[Job]:
+        return list(self.iter_jobs(state))
 
     def counts_by_state(self) -> Dict[JobState, int]:
         conn = self._get_connection()
-        try:
-            cur = conn.execute("SELECT state, COUNT(*) AS cnt FROM jobs GROUP BY state;")
-            result: Dict[JobState, int] = {s: 0 for s in JobState}
-            for row in cur.fetchall():
-                state = JobState(row["state"])
-                result[state] = row["cnt"]
-            return result
-        finally:
-            conn.close()
+        cur = conn.execute("SELECT state, COUNT(*) AS cnt FROM jobs GROUP BY state;")
+        result: Dict[JobState, int] = {s: 0 for s in JobState}
+        for row in cur.fetchall():
+            state = _STATE_CACHE[row["state"]]
+            result[state] = row["cnt"]
+        return result
+
+    def metrics_aggregate(self) -> Dict[str, object]:
+        # Let SQLite do the counting and averaging in C instead of
+        # materializing every row and aggregating in Python.
+        conn = self._get_connection()
+        cur = conn.execute(
+            "SELECT state, COUNT(*) AS cnt, SUM(attempts) AS attempts_sum "
+            "FROM jobs GROUP BY state;"
+        )
+        counts: Dict[JobState, int] = {s: 0 for s in JobState}
+        attempts_sum: Dict[JobState, int] = {s: 0 for s in JobState}
+        for row in cur.fetchall():
+            state = _STATE_CACHE[row["state"]]
+            counts[state] = row["cnt"]
+            attempts_sum[state] = row["attempts_sum"] or 0
+
+        cur = conn.execute(
+            "SELECT AVG(updated_at_ts - created_at_ts) "
+            "AS avg_duration FROM jobs WHERE state = ?;",
+            (JobState.COMPLETED.value,),
+        )
+        row = cur.fetchone()
+        avg_duration = row["avg_duration"] if row and row["avg_duration"] else 0.0
+
+        return {
+            "counts": counts,
+            "attempts_sum": attempts_sum,
+            "avg_duration_completed": avg_duration,
+        }
 
     def acquire_due_job(self, now_iso: str) -> Optional[Job]:
-        
+        jobs = self.acquire_due_jobs(now_iso, 1)
+        return jobs[0] if jobs else None
+
+    def acquire_due_jobs(self, now_iso: str, limit: int) -> List[Job]:
+        # Claiming a batch amortizes the claim transaction (and its WAL
+        # write) over `limit` jobs instead of paying it per dequeue.
         conn = self._get_connection()
-        try:
-            conn.execute("BEGIN IMMEDIATE;")
+        if _SUPPORTS_RETURNING:
+            # One atomic statement claims the whole batch: no explicit
+            # transaction, no separate SELECT round-trip.
             cur = conn.execute(
-                """
-                SELECT * FROM jobs
-                WHERE state IN (?, ?)
-                  AND (next_run_at IS NULL OR next_run_at <= ?)
-                ORDER BY created_at
-                LIMIT 1
-                """,
-                (JobState.PENDING.value, JobState.FAILED.value, now_iso),
+                _SQL_ACQUIRE_CLAIM,
+                (
+                    JobState.PROCESSING.value,
+                    now_iso,
+                    now_iso,
+                    now_iso,
+                    limit,
+                ),
             )
-            row = cur.fetchone()
-            if not row:
+            cur.row_factory = _job_row_factory
+            return cur.fetchall()
+        return self._acquire_due_jobs_txn(conn, now_iso, limit)
+
+    def _acquire_due_jobs_txn(
+        self, conn: sqlite3.Connection, now_iso: str, limit: int
+    ) -> List[Job]:
+        # SELECT-then-UPDATE fallback for SQLite builds without RETURNING
+        # (older than 3.35).
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            cur = conn.execute(_SQL_ACQUIRE_SELECT, (now_iso, limit))
+            rows = cur.fetchall()
+            if not rows:
                 conn.execute("COMMIT;")
-                return None
+                return []
 
-            job = self._row_to_job(row)
-            job.state = JobState.PROCESSING
-            job.updated_at = now_iso
-            conn.execute(
-                """
-                UPDATE jobs
-                SET state = ?, updated_at = ?
-                WHERE id = ?
-                """,
-                (job.state.value, job.updated_at, job.id),
+            jobs = []
+            for row in rows:
+                job = self._row_to_job(row)
+                job.state = JobState.PROCESSING
+                job.updated_at = now_iso
+                jobs.append(job)
+            conn.executemany(
+                _SQL_ACQUIRE_UPDATE,
+                [(j.state.value, j.updated_at, j.updated_at, j.id) for j in jobs],
             )
             conn.execute("COMMIT;")
-            return job
+            return jobs
         except Exception:
             conn.execute("ROLLBACK;")
             raise
-        finally:
-            conn.close()
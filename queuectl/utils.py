@@ -1,73 +1,266 @@
 
+import base64
+import itertools
 import os
+import struct
+import time
 from pathlib import Path
-from datetime import datetime
-import uuid
-from typing import List
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to self-deleting marker files
+    fcntl = None
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 LOGS_DIR = DATA_DIR / "logs"
 STOP_FLAG_PATH = DATA_DIR / "worker.stop"
+WAKEUP_FIFO_PATH = DATA_DIR / "wakeup.fifo"
+WORKERS_LOCK_PATH = DATA_DIR / "workers.lock"
+
+MAX_WORKER_SLOTS = 256
+
+
+_DIRS_ENSURED = False
 
 
 def ensure_data_dirs() -> None:
+    # Nearly every helper calls this; after the first success it's just a
+    # branch instead of two mkdir syscalls.
+    global _DIRS_ENSURED
+    if _DIRS_ENSURED:
+        return
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    _DIRS_ENSURED = True
+
+
+def _reset_dirs_cache() -> None:
+    # Test hook: force the next ensure_data_dirs() to re-create the dirs.
+    global _DIRS_ENSURED
+    _DIRS_ENSURED = False
+
+
+# Callers only ever want strings back, so skip the per-call Path
+# construction and stringification.
+_DATA_DIR_STR = str(DATA_DIR)
+_LOGS_DIR_STR = str(LOGS_DIR)
 
 
 def get_data_file(name: str) -> str:
     ensure_data_dirs()
-    return str(DATA_DIR / name)
+    return f"{_DATA_DIR_STR}{os.sep}{name}"
 
 
 def get_logs_dir() -> str:
     ensure_data_dirs()
-    return str(LOGS_DIR)
+    return _LOGS_DIR_STR
 
 
 def utc_now() -> datetime:
-    return datetime.utcnow()
+    # Naive UTC, so isoformat() output stays comparable with the stored
+    # timestamp strings. utcnow() is deprecated since 3.12.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Timestamps are second-granular, so the formatted string only changes
+# when the wall-clock second does; cache it instead of allocating a
+# datetime and formatting on every state transition.
+_ISO_CACHE: list = [0, ""]
 
 
 def utc_now_iso() -> str:
-    return utc_now().isoformat(timespec="seconds")
+    now = int(time.time())
+    if now != _ISO_CACHE[0]:
+        _ISO_CACHE[0] = now
+        _ISO_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now))
+    return _ISO_CACHE[1]
+
+
+# Job ids only need to be unique within the database, not unguessable,
+# so a pid+startup-time prefix plus a monotonic counter beats uuid4's
+# CSPRNG read and 36-char formatting on every enqueue. Shorter ids also
+# mean narrower index keys in SQLite.
+_ID_COUNTER = itertools.count()
+
+
+def _make_id_prefix() -> str:
+    raw = struct.pack(">II", os.getpid() & 0xFFFFFFFF, time.time_ns() & 0xFFFFFFFF)
+    return base64.b32encode(raw).decode("ascii").rstrip("=").lower()
+
+
+_ID_PREFIX = _make_id_prefix()
+
+
+def _reset_id_state() -> None:
+    # Forked children must not reuse the parent's prefix/counter.
+    global _ID_PREFIX, _ID_COUNTER
+    _ID_PREFIX = _make_id_prefix()
+    _ID_COUNTER = itertools.count()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_state)
 
 
 def generate_job_id() -> str:
-    return str(uuid.uuid4())
+    return f"{_ID_PREFIX}-{next(_ID_COUNTER):x}"
+
+
+# Worker loops check the stop flag after every wakeup and completion;
+# caching a short-lived stat result keeps tight loops from issuing one
+# stat per check while still noticing a human-initiated stop within
+# 100ms. Setting or clearing the flag invalidates the cache directly.
+_STOP_CACHE: list = [0.0, False]
+
+_STOP_FLAG_STR = str(STOP_FLAG_PATH)
 
 
 def has_stop_flag() -> bool:
-    return STOP_FLAG_PATH.exists()
+    now = time.monotonic()
+    if now - _STOP_CACHE[0] < 0.1:
+        return _STOP_CACHE[1]
+    exists = os.path.exists(_STOP_FLAG_STR)
+    _STOP_CACHE[0] = now
+    _STOP_CACHE[1] = exists
+    return exists
 
 
 def create_stop_flag() -> None:
     ensure_data_dirs()
-    STOP_FLAG_PATH.write_text("stop", encoding="utf-8")
+    # Raw os-level open/write skips the TextIOWrapper and encoder setup
+    # that Path.write_text pays for a 4-byte file.
+    fd = os.open(_STOP_FLAG_STR, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, b"stop")
+    finally:
+        os.close(fd)
+    _STOP_CACHE[0] = 0.0
+    notify_workers()
+
+
+def notify_fifo_path() -> Path:
+    return WAKEUP_FIFO_PATH
+
+
+def init_wakeup_fifo() -> None:
+    ensure_data_dirs()
+    try:
+        os.mkfifo(WAKEUP_FIFO_PATH)
+    except FileExistsError:
+        pass
+
+
+def notify_workers() -> None:
+    """Wake any idle workers blocked on the wakeup FIFO.
+
+    Opening the FIFO write-only and non-blocking fails with ENXIO when no
+    worker is listening; that just means there is nobody to wake.
+    """
+    if not hasattr(os, "mkfifo"):
+        return
+    try:
+        fd = os.open(str(WAKEUP_FIFO_PATH), os.O_WRONLY | os.O_NONBLOCK)
+    except OSError:
+        return
+    try:
+        os.write(fd, b"x")
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def clear_stop_flag() -> None:
-    if STOP_FLAG_PATH.exists():
-        STOP_FLAG_PATH.unlink()
+    # Unlink directly and swallow the miss: one syscall instead of an
+    # exists() stat followed by the unlink.
+    try:
+        os.unlink(_STOP_FLAG_STR)
+    except FileNotFoundError:
+        pass
+    _STOP_CACHE[0] = 0.0
 
 
-def worker_pid_file(pid: int) -> Path:
-    return DATA_DIR / f"worker_{pid}.pid"
+def drop_from_cache(path: str) -> None:
+    """Tell the kernel a finished file won't be read again.
 
+    Completed-job logs otherwise pile up in the page cache and evict the
+    hot SQLite pages the workers poll on. Silently a no-op where
+    posix_fadvise is unavailable or the file vanished.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
 
-def register_worker_pid(pid: int) -> None:
-    ensure_data_dirs()
-    pf = worker_pid_file(pid)
-    pf.write_text(str(pid), encoding="utf-8")
 
+# Fallback registration for platforms without fcntl: each worker holds
+# an O_TEMPORARY marker file open, which Windows deletes when the last
+# handle goes away — including on a crash — so stale registrations
+# still cannot outlive their process.
+_SLOT_MARKER_PREFIX = "worker_slot_"
 
-def unregister_worker_pid(pid: int) -> None:
-    pf = worker_pid_file(pid)
-    if pf.exists():
-        pf.unlink()
 
+def acquire_worker_slot() -> int:
+    """Claim a byte-range lock in workers.lock and return its fd.
 
-def list_worker_pid_files() -> List[Path]:
+    Each live worker holds an exclusive lock on one byte of the shared
+    lock file. The kernel releases the lock when the process exits, so a
+    crashed worker can never leave a stale registration behind the way a
+    pid file could.
+    """
     ensure_data_dirs()
-    return list(DATA_DIR.glob("worker_*.pid"))
+    if fcntl is None:
+        marker = (
+            f"{_DATA_DIR_STR}{os.sep}{_SLOT_MARKER_PREFIX}{os.getpid()}.pid"
+        )
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_TEMPORARY", 0)
+        return os.open(marker, flags, 0o644)
+    fd = os.open(str(WORKERS_LOCK_PATH), os.O_RDWR | os.O_CREAT, 0o644)
+    for slot in range(MAX_WORKER_SLOTS):
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+            return fd
+        except OSError:
+            continue
+    os.close(fd)
+    raise RuntimeError(f"All {MAX_WORKER_SLOTS} worker slots are taken")
+
+
+def release_worker_slot(fd: int) -> None:
+    # Closing the fd drops the record lock (or deletes the marker file).
+    os.close(fd)
+
+
+def count_active_workers() -> int:
+    """Count live workers by probing the slot bytes with shared locks."""
+    if fcntl is None:
+        try:
+            with os.scandir(_DATA_DIR_STR) as it:
+                return sum(
+                    1 for e in it if e.name.startswith(_SLOT_MARKER_PREFIX)
+                )
+        except FileNotFoundError:
+            return 0
+    try:
+        fd = os.open(str(WORKERS_LOCK_PATH), os.O_RDONLY)
+    except FileNotFoundError:
+        return 0
+    active = 0
+    try:
+        for slot in range(MAX_WORKER_SLOTS):
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_SH | fcntl.LOCK_NB, 1, slot)
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, slot)
+            except OSError:
+                active += 1
+    finally:
+        os.close(fd)
+    return active
@@ -1,7 +1,10 @@
 
 
+import os
+import sys
 import time
 import signal
+import selectors
 import multiprocessing
 import traceback
 
@@ -11,6 +14,8 @@ from .engine import QueueEngine
 from .executor import run_job
 from . import utils
 
+__all__ = ["worker_main", "start_workers", "stop_workers_command"]
+
 
 _STOP_REQUESTED = False
 
@@ -20,13 +25,12 @@ def _signal_handler(signum, frame):
     _STOP_REQUESTED = True
 
 
-def worker_main(worker_index: int) -> None:
-    
+def worker_main(worker_index: int, config: Config) -> None:
+
     global _STOP_REQUESTED
     _STOP_REQUESTED = False
 
-    pid = multiprocessing.current_process().pid
-    utils.register_worker_pid(pid)
+    slot_fd = utils.acquire_worker_slot()
 
     signal.signal(signal.SIGINT, _signal_handler)
     try:
@@ -34,33 +38,99 @@ def worker_main(worker_index: int) -> None:
     except Exception:
         pass
 
-    config = Config()
     storage = JobStorage()
     engine = QueueEngine(storage, config)
 
+    # Route signals through the selector as well: set_wakeup_fd makes
+    # the interpreter write a byte to this pipe from the C-level signal
+    # path, so a stop signal arriving mid-select unblocks it at the cost
+    # of one write instead of waiting out the select timeout.
+    if hasattr(os, "pipe2"):
+        sig_r, sig_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+    else:
+        sig_r, sig_w = os.pipe()
+        os.set_blocking(sig_r, False)
+        os.set_blocking(sig_w, False)
+    signal.set_wakeup_fd(sig_w)
+
+    sel = selectors.DefaultSelector()
+    sel.register(sig_r, selectors.EVENT_READ)
+
+    # Idle workers block on a wakeup FIFO that the enqueue path (and the
+    # stop flag) write to, instead of sleeping and re-polling every
+    # second. The 5s ceiling keeps stop-flag polling working even if a
+    # wakeup write is ever lost.
+    #
+    # An eventfd/io_uring wake would shave the remaining per-wake read,
+    # but eventfds are anonymous: enqueues arrive from short-lived CLI
+    # processes that have no way to obtain the workers' fd. The named
+    # FIFO is the rendezvous point that works across unrelated
+    # processes, and the selector here is epoll-backed already.
+    wake_fd = None
+    if hasattr(os, "mkfifo"):
+        utils.init_wakeup_fifo()
+        # O_RDWR keeps a writer open on the FIFO so reads never hit EOF
+        # (which would make select() spin) once enqueuers disconnect.
+        wake_fd = os.open(str(utils.notify_fifo_path()), os.O_RDWR | os.O_NONBLOCK)
+        sel.register(wake_fd, selectors.EVENT_READ)
+
+    def _idle_wait() -> None:
+        # Without the FIFO the select is just an interruptible poll
+        # interval, so keep it at the old one-second cadence.
+        timeout = 5.0 if wake_fd is not None else 1.0
+        for key, _ in sel.select(timeout=timeout):
+            try:
+                while os.read(key.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
     try:
         while True:
             if _STOP_REQUESTED or utils.has_stop_flag():
                 break
 
-            job = engine.acquire_job_for_worker()
-            if not job:
-                time.sleep(1.0)
+            # Claim a batch of due jobs in one statement so the claim
+            # transaction is amortized over the batch instead of paid
+            # once per job.
+            batch = engine.acquire_jobs_for_worker()
+            if not batch:
+                _idle_wait()
                 continue
 
-            try:
-                result = run_job(job, timeout=config.job_timeout)
-                if result.exit_code == 0:
-                    engine.complete_job(job, result.output_log_path)
-                else:
-                    engine.fail_job(job, result.error_message or "Unknown error")
-            except Exception as e:  # noqa: BLE001
-                # Any unexpected failure should still mark the job as failed
-                tb = traceback.format_exc()
-                msg = f"Worker exception: {e}\n{tb}"
-                engine.fail_job(job, msg)
+            for idx, job in enumerate(batch):
+                if _STOP_REQUESTED or utils.has_stop_flag():
+                    # Hand unstarted claims back so they aren't stranded
+                    # in 'processing' across the shutdown.
+                    for leftover in batch[idx:]:
+                        engine.release_job(leftover)
+                    break
+
+                try:
+                    result = run_job(job, timeout=config.job_timeout)
+                    if result.exit_code == 0:
+                        engine.complete_job(job, result.output_log_path)
+                    else:
+                        engine.fail_job(job, result.error_message or "Unknown error")
+                except Exception as e:  # noqa: BLE001
+                    # Any unexpected failure should still mark the job as
+                    # failed. The traceback streams to a per-job log file so
+                    # the database row only stores a short message and a
+                    # path, not a multi-KB string built in memory.
+                    fail_log = os.path.join(utils.get_logs_dir(), f"fail_{job.id}.log")
+                    with open(fail_log, "w", encoding="utf-8") as f:
+                        traceback.print_exception(*sys.exc_info(), file=f)
+                    engine.fail_job(
+                        job, f"Worker exception: {e}", output_log_path=fail_log
+                    )
     finally:
-        utils.unregister_worker_pid(pid)
+        signal.set_wakeup_fd(-1)
+        sel.close()
+        if wake_fd is not None:
+            os.close(wake_fd)
+        os.close(sig_r)
+        os.close(sig_w)
+        utils.release_worker_slot(slot_fd)
 
 
 def start_workers(count: int) -> None:
@@ -68,14 +138,64 @@ def start_workers(count: int) -> None:
     utils.ensure_data_dirs()
     procs = []
 
+    # Fork children where the platform allows it: they inherit the
+    # already-imported queuectl modules copy-on-write instead of
+    # re-executing the interpreter and re-importing everything under
+    # spawn. SQLite handles stay fork-safe because JobStorage keys its
+    # connection on the pid and each child opens its own.
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+    else:
+        ctx = multiprocessing.get_context()
+
+    # Build and load the config once in the parent: forked children
+    # share the parsed pages copy-on-write, and under spawn one pickle
+    # beats one config-file read per worker.
+    config = Config()
+    config._ensure_loaded()
+
     print(f"Starting {count} worker(s)...")
 
     for i in range(count):
-        p = multiprocessing.Process(target=worker_main, args=(i + 1,))
+        p = ctx.Process(target=worker_main, args=(i + 1, config))
         p.start()
         procs.append(p)
 
     print("Workers are running. Press Ctrl+C to stop them.")
+    if hasattr(signal, "sigwait"):
+        _supervise_sigwait(procs)
+    else:
+        _supervise_poll(procs)
+
+
+def _supervise_sigwait(procs) -> None:
+    # Sleep until a child exits or the user signals, instead of calling
+    # waitpid on every child once a second. SIGCHLD/SIGINT/SIGTERM are
+    # blocked so sigwait can consume them synchronously.
+    sigs = {signal.SIGCHLD, signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, sigs)
+    try:
+        while any(p.is_alive() for p in procs):
+            sig = signal.sigwait(sigs)
+            if sig in (signal.SIGINT, signal.SIGTERM):
+                print("Received stop signal, asking workers to stop...")
+                utils.create_stop_flag()
+                for p in procs:
+                    p.join(timeout=30.0)
+                utils.clear_stop_flag()
+                return
+            # SIGCHLD: reap whichever children have exited
+            for p in procs:
+                if not p.is_alive():
+                    p.join(timeout=0)
+        for p in procs:
+            p.join(timeout=1.0)
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, sigs)
+
+
+def _supervise_poll(procs) -> None:
+    # Fallback for platforms without sigwait.
     try:
         while any(p.is_alive() for p in procs):
             time.sleep(1.0)
@@ -93,21 +213,20 @@ def start_workers(count: int) -> None:
 def stop_workers_command() -> None:
     
     utils.ensure_data_dirs()
-    pid_files_before = utils.list_worker_pid_files()
-    if not pid_files_before:
+    if not utils.count_active_workers():
         print("No active workers found.")
         return
 
     print("Signaling workers to stop gracefully...")
     utils.create_stop_flag()
 
-    # Wait for workers to remove their PID files
+    # Wait for the workers' slot locks to be released
     for _ in range(30):
         time.sleep(1.0)
-        if not utils.list_worker_pid_files():
+        if not utils.count_active_workers():
             break
 
-    if utils.list_worker_pid_files():
+    if utils.count_active_workers():
         print("Workers are still shutting down. They will exit shortly.")
     else:
         print("All workers stopped.")
@@ -8,7 +8,7 @@ Basic smoke test:
 - Verify it's in 'completed' state
 """
 
-import os
+from pathlib import Path
 
 from queuectl.config import Config
 from queuectl.storage import JobStorage
@@ -23,8 +23,7 @@ def main() -> None:
 
     # Use a separate DB for this test so we don't touch real data
     db_path = utils.get_data_file("test_basic_jobs.db")
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    Path(db_path).unlink(missing_ok=True)
 
     config = Config()
     storage = JobStorage(db_path=db_path)
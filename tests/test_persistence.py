@@ -6,7 +6,7 @@ Persistence test:
 - Verify job is still present and pending
 """
 
-import os
+from pathlib import Path
 
 from queuectl.config import Config
 from queuectl.storage import JobStorage
@@ -19,8 +19,7 @@ def main() -> None:
     print("=== test_persistence: jobs persist across restart ===")
 
     db_path = utils.get_data_file("test_persistence_jobs.db")
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    Path(db_path).unlink(missing_ok=True)
 
     config = Config()
 
@@ -7,7 +7,7 @@ Retry & backoff behavior:
 - After second failure: state=dead, next_run_at=None
 """
 
-import os
+from pathlib import Path
 from datetime import datetime
 
 from queuectl.config import Config
@@ -25,8 +25,7 @@ def main() -> None:
     print("=== test_retry_backoff: failed job -> backoff -> DLQ ===")
 
     db_path = utils.get_data_file("test_retry_jobs.db")
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    Path(db_path).unlink(missing_ok=True)
 
     config = Config()
     # Make sure config has small values